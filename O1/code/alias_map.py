@@ -1,110 +1,193 @@
-import logging
-from typing import Dict
-from normalization import normalize_text
-
-def build_alias_map_markets(markets_data: Dict[str, Dict]) -> Dict[str, str]:
-    """
-    Build a dictionary mapping normalized market aliases to their canonical market names.
-
-    This function expects a dictionary of markets, each possibly containing an "aliases" key.
-    It normalizes all aliases and ensures that the canonical market name is also treated as an alias.
-    Then it creates a reverse lookup so that any alias maps back to the canonical market name.
-
-    Example:
-        markets_data = {
-            "match odds": {"aliases": ["Full Time Result"]},
-            "over/under 2.5 goals": {"aliases": []}
-        }
-
-        Returns something like:
-        {
-            "match odds": "match odds",
-            "full time result": "match odds",
-            "over/under 2.5 goals": "over/under 2.5 goals"
-        }
-
-    :param markets_data: A dictionary keyed by market name. Each value is another dict with possible "aliases".
-                         For example:
-                         {
-                           "match odds": {"aliases": ["Full Time Result"]}
-                         }
-                         Ensure this data is pre-loaded from external configuration or data source.
-    :return: A dictionary mapping every normalized alias back to its canonical market name.
-    """
-    logging.debug("Starting to build alias map for markets.")
-
-    if not markets_data:
-        logging.warning("No market data provided. Returning empty alias map for markets.")
-        return {}
-
-    alias_map = {}
-    for market_name, data in markets_data.items():
-        aliases = data.get("aliases", [])
-        # Ensure the canonical market name is included as an alias
-        if market_name not in aliases:
-            aliases.append(market_name)
-
-        logging.debug(f"Processing market '{market_name}' with aliases: {aliases}")
-
-        for a in aliases:
-            norm_a = normalize_text(a)
-            alias_map[norm_a] = market_name
-            logging.debug(f"Alias '{a}' normalized to '{norm_a}' mapped to '{market_name}'")
-
-    logging.debug("Completed building alias map for markets.")
-    return alias_map
-
-def build_alias_map_teams(teams_data: Dict[str, Dict]) -> Dict[str, str]:
-    """
-    Build a dictionary mapping normalized team aliases to their canonical team names.
-
-    Similar to the markets function, this ensures that every alias for a team,
-    as well as the team's canonical name, is included in the returned map.
-    Any alias can then be used to find the canonical team name quickly.
-
-    Example:
-        teams_data = {
-            "Manchester United": {"sport": "football", "aliases": ["Man Utd", "Man United"]},
-            "Chelsea": {"sport": "football", "aliases": []}
-        }
-
-        Returns:
-        {
-            "manchester united": "Manchester United",
-            "man utd": "Manchester United",
-            "man united": "Manchester United",
-            "chelsea": "Chelsea"
-        }
-
-    :param teams_data: A dictionary keyed by team name. Values contain team info, including an "aliases" list.
-                       For example:
-                       {
-                         "Manchester United": {
-                           "sport": "football",
-                           "aliases": ["Man Utd", "Man United"]
-                         }
-                       }
-                       This data should be pre-loaded from external configuration or data source.
-    :return: A dictionary mapping normalized aliases to their canonical team name.
-    """
-    logging.debug("Starting to build alias map for teams.")
-
-    if not teams_data:
-        logging.warning("No team data provided. Returning empty alias map for teams.")
-        return {}
-
-    alias_map = {}
-    for team_name, data in teams_data.items():
-        norm_team = normalize_text(team_name)
-        alias_map[norm_team] = team_name
-        logging.debug(f"Team '{team_name}' normalized to '{norm_team}'.")
-
-        # Add each alias
-        for a in data.get("aliases", []):
-            if a.strip():
-                norm_a = normalize_text(a)
-                alias_map[norm_a] = team_name
-                logging.debug(f"Alias '{a}' normalized to '{norm_a}' mapped to '{team_name}'")
-
-    logging.debug("Completed building alias map for teams.")
-    return alias_map
+import re
+import logging
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+from normalization import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Marks a complete alias in a trie built by build_alias_trie(); never a valid token.
+TRIE_END = None
+
+def normalize_aliases(name: str, data: Dict) -> Tuple[str, ...]:
+    """
+    Normalize the canonical name and non-blank aliases of a team or market record, once.
+
+    DataManager stores the result on each record as "_norm_aliases" at load time so the alias
+    map builders don't re-normalize (or mutate) the "aliases" lists on every build.
+
+    Example:
+        normalize_aliases("Manchester United", {"aliases": ["Man Utd", "man utd", " "]})
+
+        Returns:
+        ("manchester united", "man utd")
+
+    :param name: The canonical team or market name.
+    :param data: The record, possibly containing an "aliases" list.
+    :return: A tuple of distinct normalized aliases, canonical name first.
+    """
+    aliases = [name] + [a for a in data.get("aliases", []) if a.strip()]
+    return tuple(dict.fromkeys(normalize_text(a) for a in aliases))
+
+def build_alias_map_markets(markets_data: Dict[str, Dict]) -> Dict[str, str]:
+    """
+    Build a dictionary mapping normalized market aliases to their canonical market names.
+
+    This function expects a dictionary of markets, each possibly containing an "aliases" key.
+    The canonical market name is also treated as an alias. Each market's normalized aliases are
+    taken from its precomputed "_norm_aliases" (see normalize_aliases), so the input is not mutated.
+    Then it creates a reverse lookup so that any alias maps back to the canonical market name.
+
+    Example:
+        markets_data = {
+            "match odds": {"aliases": ["Full Time Result"]},
+            "over/under 2.5 goals": {"aliases": []}
+        }
+
+        Returns something like:
+        {
+            "match odds": "match odds",
+            "full time result": "match odds",
+            "over/under 2.5 goals": "over/under 2.5 goals"
+        }
+
+    :param markets_data: A dictionary keyed by market name. Each value is another dict with possible "aliases".
+                         For example:
+                         {
+                           "match odds": {"aliases": ["Full Time Result"]}
+                         }
+                         Ensure this data is pre-loaded from external configuration or data source.
+    :return: A dictionary mapping every normalized alias back to its canonical market name.
+    """
+    logger.debug("Starting to build alias map for markets.")
+
+    if not markets_data:
+        logger.warning("No market data provided. Returning empty alias map for markets.")
+        return {}
+
+    alias_map = {norm_a: market_name
+                 for market_name, data in markets_data.items()
+                 for norm_a in data.get("_norm_aliases") or normalize_aliases(market_name, data)}
+
+    logger.debug("Completed building alias map for markets.")
+    return alias_map
+
+def build_alias_map_teams(teams_data: Dict[str, Dict]) -> Dict[str, str]:
+    """
+    Build a dictionary mapping normalized team aliases to their canonical team names.
+
+    Similar to the markets function, this ensures that every alias for a team,
+    as well as the team's canonical name, is included in the returned map, reading the
+    precomputed "_norm_aliases" of each team where present.
+    Any alias can then be used to find the canonical team name quickly.
+
+    Example:
+        teams_data = {
+            "Manchester United": {"sport": "football", "aliases": ["Man Utd", "Man United"]},
+            "Chelsea": {"sport": "football", "aliases": []}
+        }
+
+        Returns:
+        {
+            "manchester united": "Manchester United",
+            "man utd": "Manchester United",
+            "man united": "Manchester United",
+            "chelsea": "Chelsea"
+        }
+
+    :param teams_data: A dictionary keyed by team name. Values contain team info, including an "aliases" list.
+                       For example:
+                       {
+                         "Manchester United": {
+                           "sport": "football",
+                           "aliases": ["Man Utd", "Man United"]
+                         }
+                       }
+                       This data should be pre-loaded from external configuration or data source.
+    :return: A dictionary mapping normalized aliases to their canonical team name.
+    """
+    logger.debug("Starting to build alias map for teams.")
+
+    if not teams_data:
+        logger.warning("No team data provided. Returning empty alias map for teams.")
+        return {}
+
+    alias_map = {norm_a: team_name
+                 for team_name, data in teams_data.items()
+                 for norm_a in data.get("_norm_aliases") or normalize_aliases(team_name, data)}
+
+    logger.debug("Completed building alias map for teams.")
+    return alias_map
+
+def build_market_alias_index(markets_data: Dict[str, Dict]) -> List[Tuple[str, str, str]]:
+    """
+    Build the list of market aliases used for fuzzy matching leftover bet text.
+
+    Unlike build_alias_map_markets, this keeps every alias (including duplicates across markets)
+    in catalogue order, so the first market that owns an alias wins ties during fuzzy scoring.
+    The canonical market name is always included as one of its own aliases.
+
+    Example:
+        markets_data = {"match odds": {"aliases": ["To Win"]}}
+
+        Returns:
+        [("match odds", "To Win", "to win"), ("match odds", "match odds", "match odds")]
+
+    :param markets_data: A dictionary keyed by market name. Each value is another dict with possible "aliases".
+    :return: A list of (market_name, raw_alias, normalized_alias) tuples.
+    """
+    index = []
+    for market_name, data in markets_data.items():
+        aliases = data.get("aliases", [])
+        if market_name not in aliases:
+            aliases = aliases + [market_name]
+        for alias in aliases:
+            index.append((market_name, alias, normalize_text(alias)))
+    return index
+
+def build_alias_trie(alias_map: Dict[str, str]) -> Dict:
+    """
+    Build a token trie over the normalized aliases of an alias map.
+
+    Each level is a dict keyed by the next normalized token; the TRIE_END key marks that the
+    tokens walked so far form a complete alias and holds its (canonical_name, normalized_alias).
+    This lets callers find the longest alias starting at a token by walking forward only while
+    a prefix exists.
+
+    Example:
+        {"man utd": "Manchester United", "man": "Man FC"}
+
+        Returns:
+        {"man": {TRIE_END: ("Man FC", "man"), "utd": {TRIE_END: ("Manchester United", "man utd")}}}
+
+    :param alias_map: A dictionary mapping normalized aliases to their canonical names.
+    :return: The root node of the trie.
+    """
+    root = {}
+    for alias, canonical in alias_map.items():
+        node = root
+        for token in alias.split(" "):
+            node = node.setdefault(token, {})
+        node[TRIE_END] = (canonical, alias)
+    return root
+
+def build_alias_pattern(aliases: Iterable[str]) -> Optional[Pattern]:
+    """
+    Compile a single alternation regex matching any of the given aliases as whole tokens.
+
+    Aliases are tried longest first, so where several aliases start at the same position the
+    longest one wins. Matches must be bounded by whitespace or the ends of the text, which
+    keeps "over 2" from matching inside "over 2.5".
+
+    Example:
+        build_alias_pattern(["over 2.5", "btts"]).search("btts over 2.5").group()
+
+        Returns:
+        "btts"
+
+    :param aliases: Normalized aliases, as they appear in the text to be searched.
+    :return: The compiled pattern, or None if there are no non-empty aliases.
+    """
+    alternatives = sorted({alias for alias in aliases if alias}, key=len, reverse=True)
+    if not alternatives:
+        return None
+    return re.compile(r"(?<!\S)(?:" + "|".join(map(re.escape, alternatives)) + r")(?!\S)")
@@ -1,268 +1,572 @@
-import json
-import os
-import logging
-import betfairlightweight
-from betfairlightweight.filters import market_filter, price_projection
-
-from config import DATA_PATH, config
-
-# Load paths from config
-CERT_PATH = config.get("cert_path", "C:/Valuebet/O1/certificates")
-CREDENTIALS_PATH = os.path.join(DATA_PATH, config.get("credentials_path", "credentials.json"))
-
-def load_credentials():
-    """
-    Load Betfair API credentials from the credentials file specified in config.
-
-    The credentials file is expected to be a JSON with keys:
-    {
-      "username": "...",
-      "password": "...",
-      "app_key": "..."
-    }
-
-    If the file is missing or malformed, this function logs an error and returns an empty dict.
-    Callers should check if credentials are present before attempting login.
-
-    :return: A dictionary with keys 'username', 'password', 'app_key' if successful, else empty dict.
-    """
-    creds_path = CREDENTIALS_PATH
-    try:
-        logging.debug(f"Attempting to load credentials from {creds_path}")
-        with open(creds_path, "r", encoding="utf-8") as f:
-            creds = json.load(f)
-        logging.debug("Credentials loaded successfully.")
-        return creds
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        logging.error(f"Error loading credentials: {e}")
-        return {}
-
-
-class BetfairClient:
-    """
-    A wrapper around Betfair's API client (betfairlightweight) to perform operations like:
-    - Logging in with provided credentials
-    - Listing events, market catalogues, and market books
-
-    This class expects the following to be properly configured:
-      - Credentials (username, password, app_key) via credentials_path in config.json
-      - A certificate path (cert_path in config.json)
-
-    Usage:
-      - Instantiate BetfairClient()
-      - Call .login() to authenticate
-      - Use list_events(), list_market_catalogue(), list_market_book() to fetch data
-
-    Error Handling:
-      - If credentials are missing or invalid, login will fail with an error message.
-      - If listing events/markets is attempted without login, the class will attempt to login again or log an error.
-      - Network or API errors are logged as errors, and you may handle them by checking for empty results.
-    """
-
-    def __init__(self):
-        logging.debug("Initializing BetfairClient with betfairlightweight.")
-        self.creds = load_credentials()
-        self.username = self.creds.get("username")
-        self.password = self.creds.get("password")
-        self.app_key = self.creds.get("app_key")
-        self.trading = None
-
-        if not self.username or not self.password or not self.app_key:
-            logging.warning("Credentials incomplete or missing. Login attempts will fail until credentials are set properly.")
-
-        logging.debug(f"BetfairClient initialized with username={self.username}, app_key={self.app_key}")
-
-    def login(self):
-        """
-        Authenticate with the Betfair API using loaded credentials.
-
-        If credentials are missing or invalid, logs an error and does not raise an exception.
-        The caller should check if login was successful by checking if self.trading is not None.
-        """
-        if not (self.username and self.password and self.app_key):
-            logging.error("Missing Betfair credentials (username/password/app_key). Check credentials configuration.")
-            return
-
-        logging.debug("Creating Betfair APIClient instance.")
-        self.trading = betfairlightweight.APIClient(
-            username=self.username,
-            password=self.password,
-            app_key=self.app_key,
-            certs=CERT_PATH
-        )
-
-        try:
-            logging.debug("Attempting login via betfairlightweight...")
-            self.trading.login()
-            logging.info("Login successful. Fetching prices from Betfair Exchange.")
-        except betfairlightweight.exceptions.LoginError as e:
-            logging.error(f"Login error: {e}. Please check your credentials.")
-            self.trading = None
-        except Exception as e:
-            logging.error(f"Unexpected error during login: {e}")
-            self.trading = None
-
-    def list_events(self, filter_dict):
-        """
-        List events from Betfair based on a given filter.
-
-        :param filter_dict: A dictionary with a "filter" key specifying eventTypeIds and/or textQuery.
-                            Example:
-                            {
-                              "filter": {
-                                "eventTypeIds": ["1"],
-                                "textQuery": "Manchester"
-                              }
-                            }
-        :return: A list containing a dictionary with "result" key. Example:
-                 [{"result": [
-                    {
-                      "event": {"id": ..., "eventName": ..., "openDate": ...},
-                      "marketCount": ...
-                    }, ...
-                 ]}]
-                 If login fails or no trading session, returns [{"result": []}].
-        """
-        logging.debug(f"list_events called with filter_dict: {filter_dict}")
-        if not self.trading:
-            logging.warning("Not logged in. Attempting to login now.")
-            self.login()
-            if not self.trading:
-                logging.error("Cannot list events without a successful login. Returning empty result.")
-                return [{"result": []}]
-
-        bf_filter = filter_dict.get("filter", {})
-        eventTypeIds = bf_filter.get("eventTypeIds", [])
-        textQuery = bf_filter.get("textQuery", "")
-
-        m_filter = market_filter(
-            event_type_ids=eventTypeIds if eventTypeIds else None,
-            text_query=textQuery if textQuery else None
-        )
-        logging.debug(f"Constructed market_filter for list_events: {m_filter}")
-
-        events = self.trading.betting.list_events(filter=m_filter)
-        logging.debug(f"list_events returned {len(events)} events.")
-        result = []
-        for e in events:
-            evt = e.event
-            result.append({
-                "event": {
-                    "id": evt.id,
-                    "eventName": evt.name,
-                    "openDate": evt.open_date.isoformat()
-                },
-                "marketCount": e.market_count
-            })
-        return [{"result": result}]
-
-    def list_market_catalogue(self, filter_dict):
-        """
-        List market catalogues for given events or market types.
-
-        :param filter_dict: Should contain:
-                            {
-                              "filter": {
-                                "eventIds": [...],
-                                "marketTypeCodes": [...]
-                              },
-                              "maxResults": int,
-                              "marketProjection": [...]
-                            }
-        :return: [{"result": [ { "marketId": ..., "marketName": ..., "runners": [...] }, ... ]}]
-                 If not logged in, attempts login and returns empty result if still not available.
-        """
-        logging.debug(f"list_market_catalogue called with filter_dict: {filter_dict}")
-        if not self.trading:
-            logging.warning("Not logged in. Attempting to login now.")
-            self.login()
-            if not self.trading:
-                logging.error("Cannot list market catalogue without a successful login. Returning empty result.")
-                return [{"result": []}]
-
-        bf_filter = filter_dict.get("filter", {})
-        maxResults = filter_dict.get("maxResults", 100)
-        marketProjection = filter_dict.get("marketProjection", [])
-
-        m_filter = market_filter(
-            event_ids=bf_filter.get("eventIds"),
-            market_type_codes=bf_filter.get("marketTypeCodes")
-        )
-        logging.debug(f"Constructed market_filter for list_market_catalogue: {m_filter}")
-
-        catalogues = self.trading.betting.list_market_catalogue(
-            filter=m_filter,
-            max_results=maxResults,
-            market_projection=marketProjection
-        )
-        logging.debug(f"list_market_catalogue returned {len(catalogues)} catalogues.")
-
-        result = []
-        for c in catalogues:
-            runners = []
-            for r in c.runners:
-                runners.append({
-                    "selectionId": r.selection_id,
-                    "runnerName": r.runner_name
-                })
-            result.append({
-                "marketId": c.market_id,
-                "marketName": c.market_name,
-                "marketStartTime": c.market_start_time.isoformat() if c.market_start_time else None,
-                "runners": runners
-            })
-        return [{"result": result}]
-
-    def list_market_book(self, filter_dict):
-        """
-        List the current state of one or more markets (market book), including runner odds.
-
-        :param filter_dict: Should contain:
-                            {
-                              "marketIds": [...],
-                              "priceProjection": {
-                                "priceData": ["EX_BEST_OFFERS", ...]
-                              }
-                            }
-        :return: [{"result": [ { "marketId": ..., "runners": [...] }, ... ]}]
-                 If not logged in, attempts login and returns empty result if still not available.
-        """
-        logging.debug(f"list_market_book called with filter_dict: {filter_dict}")
-        if not self.trading:
-            logging.warning("Not logged in. Attempting to login now.")
-            self.login()
-            if not self.trading:
-                logging.error("Cannot list market book without a successful login. Returning empty result.")
-                return [{"result": []}]
-
-        marketIds = filter_dict.get("marketIds", [])
-        priceProjectionDict = filter_dict.get("priceProjection", {})
-        price_data_list = priceProjectionDict.get("priceData", [])
-        pd = price_data_list if price_data_list else None
-
-        logging.debug(f"Preparing to call betting.list_market_book with marketIds={marketIds}, priceData={pd}")
-
-        books = self.trading.betting.list_market_book(
-            market_ids=marketIds,
-            price_projection=price_projection(price_data=pd) if pd else None
-        )
-        logging.debug(f"list_market_book returned {len(books)} market books.")
-
-        result = []
-        for b in books:
-            runners = []
-            for r in b.runners:
-                lay = [{"price": l.price, "size": l.size} for l in (r.ex.available_to_lay or [])]
-                back = [{"price": lb.price, "size": lb.size} for lb in (r.ex.available_to_back or [])]
-                runners.append({
-                    "selectionId": r.selection_id,
-                    "ex": {
-                        "availableToLay": lay,
-                        "availableToBack": back
-                    }
-                })
-            result.append({
-                "marketId": b.market_id,
-                "runners": runners
-            })
-        return [{"result": result}]
+import copy
+import os
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+import betfairlightweight
+from betfairlightweight.filters import market_filter, price_projection
+
+from config import DATA_PATH, config
+
+logger = logging.getLogger(__name__)
+
+# Load paths from config
+CERT_PATH = config.get("cert_path", "C:/Valuebet/O1/certificates")
+CREDENTIALS_PATH = os.path.join(DATA_PATH, config.get("credentials_path", "credentials.json"))
+
+# Betfair limits how much data one listMarketBook call may request, so larger marketIds
+# lists are split into chunks of this size and fetched concurrently.
+MARKET_BOOK_CHUNK_SIZE = config.get("market_book_chunk_size", 40)
+MAX_CONCURRENT_REQUESTS = config.get("max_concurrent_requests", 8)
+# Ladder depth requested per side in list_market_book unless the caller overrides it.
+MARKET_BOOK_PRICE_DEPTH = config.get("market_book_price_depth", 3)
+MARKET_BOOK_FIELDS = ("availableToLay", "availableToBack")
+# list_market_catalogue requests for more eventIds than this are split into concurrent shards,
+# so a long event list isn't truncated by a single call's maxResults.
+CATALOGUE_EVENT_CHUNK_SIZE = config.get("catalogue_event_chunk_size", 25)
+# Seconds a list_events / list_market_catalogue response is reused for an identical filter.
+EVENTS_CACHE_TTL = config.get("events_cache_ttl", 300)
+CATALOGUE_CACHE_TTL = config.get("catalogue_cache_ttl", 30)
+
+# Shared by all clients; the calls are network-bound, so threads overlap their round-trips.
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix="betfair")
+
+def build_session() -> requests.Session:
+    """
+    Build a requests.Session with a keep-alive connection pool for the Betfair endpoints.
+
+    Without a session, betfairlightweight sends each request through a fresh connection,
+    paying the TCP + TLS handshake every time. The pool is sized for MAX_CONCURRENT_REQUESTS
+    parallel calls. Only connection failures are retried, never requests that reached the
+    server, so non-idempotent calls are not repeated.
+
+    :return: A configured requests.Session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=max(10, MAX_CONCURRENT_REQUESTS),
+        max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.3)
+    )
+    session.mount("https://", adapter)
+    return session
+
+def chunked(items: list, size: int) -> list:
+    """
+    Split a list into consecutive chunks of at most `size` items.
+
+    Example:
+        chunked(["1.1", "1.2", "1.3"], 2) -> [["1.1", "1.2"], ["1.3"]]
+
+    :param items: The list to split.
+    :param size: Maximum chunk length.
+    :return: A list of chunks (empty if items is empty).
+    """
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+@lru_cache(maxsize=1)
+def load_credentials():
+    """
+    Load Betfair API credentials from the credentials file specified in config.
+
+    The credentials file is expected to be a JSON with keys:
+    {
+      "username": "...",
+      "password": "...",
+      "app_key": "..."
+    }
+
+    If the file is missing or malformed, this function logs an error and returns an empty dict.
+    Callers should check if credentials are present before attempting login.
+
+    The file is read once per process; every BetfairClient shares the result, so callers
+    must not modify the returned dict.
+
+    :return: A dictionary with keys 'username', 'password', 'app_key' if successful, else empty dict.
+    """
+    creds_path = CREDENTIALS_PATH
+    try:
+        logger.debug("Attempting to load credentials from %s", creds_path)
+        with open(creds_path, "rb") as f:
+            creds = orjson.loads(f.read())
+        logger.debug("Credentials loaded successfully.")
+        return creds
+    except (FileNotFoundError, orjson.JSONDecodeError) as e:
+        logger.error("Error loading credentials: %s", e)
+        return {}
+
+
+@lru_cache(maxsize=None)
+def find_cert_files(cert_dir: str):
+    """
+    Locate the client certificate in cert_dir, once per directory.
+
+    Follows betfairlightweight's own lookup (a .crt/.cert + .key pair, else a single .pem),
+    which it would otherwise repeat with a directory listing on every login.
+
+    :param cert_dir: Directory containing the Betfair client certificate.
+    :return: A (cert, key) tuple, a .pem path, or None if nothing suitable was found
+             (betfairlightweight then reports the problem itself at login).
+    """
+    try:
+        files = os.listdir(cert_dir)
+    except OSError as e:
+        logger.debug("Cannot read certificate directory %s: %s", cert_dir, e)
+        return None
+    cert = key = pem = None
+    for name in files:
+        ext = os.path.splitext(name)[-1]
+        if ext in (".crt", ".cert"):
+            cert = os.path.join(cert_dir, name)
+        elif ext == ".key":
+            key = os.path.join(cert_dir, name)
+        elif ext == ".pem":
+            pem = os.path.join(cert_dir, name)
+    if cert and key:
+        return (cert, key)
+    return pem
+
+
+class TTLCache:
+    """
+    A small thread-safe LRU cache whose entries also expire `ttl` seconds after being stored.
+
+    Values are deep-copied on the way in and out, so callers can freely modify what they get.
+
+    :param maxsize: Maximum number of entries; the least recently used entry is evicted first.
+    :param ttl: Lifetime of an entry in seconds.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :return: A copy of the cached value, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            value = entry[1]
+        return copy.deepcopy(value)
+
+    def set(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+@lru_cache(maxsize=256)
+def cached_market_filter(event_type_ids: tuple = None, text_query: str = None,
+                         event_ids: tuple = None, market_type_codes: tuple = None) -> dict:
+    """
+    Build (once per distinct combination) the betfairlightweight market_filter used by
+    list_events / list_market_catalogue. List arguments are passed as tuples so they can be
+    cached; the returned dict is shared between callers and must not be modified.
+    """
+    def as_list(values):
+        return list(values) if values is not None else None
+
+    return market_filter(
+        event_type_ids=as_list(event_type_ids),
+        text_query=text_query,
+        event_ids=as_list(event_ids),
+        market_type_codes=as_list(market_type_codes)
+    )
+
+def filter_cache_key(filter_dict: dict) -> bytes:
+    """
+    Canonical cache key for a request filter dict: equal filters give equal keys
+    regardless of key order.
+    """
+    return orjson.dumps(filter_dict, option=orjson.OPT_SORT_KEYS)
+
+
+# The shape_* helpers intern the ids and names they return: the same markets and runners come
+# back on every poll and end up as keys in the caches, so equal ids then share one string
+# object and compare by identity.
+
+def shape_events(events) -> list:
+    """
+    Convert betfairlightweight EventResult objects into the dicts returned by list_events().
+    """
+    result = []
+    for e in events:
+        evt = e.event
+        result.append({
+            "event": {
+                "id": sys.intern(evt.id),
+                "eventName": evt.name,
+                "openDate": evt.open_date.isoformat()
+            },
+            "marketCount": e.market_count
+        })
+    return result
+
+def shape_market_catalogues(catalogues) -> list:
+    """
+    Convert betfairlightweight MarketCatalogue objects into the dicts returned by list_market_catalogue().
+    """
+    result = []
+    for c in catalogues:
+        runners = []
+        for r in c.runners:
+            runners.append({
+                "selectionId": r.selection_id,
+                "runnerName": sys.intern(r.runner_name)
+            })
+        result.append({
+            "marketId": sys.intern(c.market_id),
+            "marketName": c.market_name,
+            "marketStartTime": c.market_start_time.isoformat() if c.market_start_time else None,
+            "runners": runners
+        })
+    return result
+
+def shape_raw_market_books(books: list, want_lay: bool = True, want_back: bool = True) -> list:
+    """
+    Convert the raw marketBook dicts of a lightweight response into the dicts returned by
+    list_market_book(), keeping only the requested ladder sides under each runner's "ex".
+
+    Betfair's {"price": ..., "size": ...} ladder entries already have the shape list_market_book()
+    returns, so the ladders are passed through as-is rather than copied.
+    """
+    result = []
+    for b in books:
+        runners = []
+        for r in b["runners"]:
+            r_ex = r.get("ex") or {}
+            ex = {}
+            if want_lay:
+                ex["availableToLay"] = r_ex.get("availableToLay") or []
+            if want_back:
+                ex["availableToBack"] = r_ex.get("availableToBack") or []
+            runners.append({
+                "selectionId": r["selectionId"],
+                "ex": ex
+            })
+        result.append({
+            "marketId": sys.intern(b["marketId"]),
+            "runners": runners
+        })
+    return result
+
+
+class BetfairClient:
+    """
+    A wrapper around Betfair's API client (betfairlightweight) to perform operations like:
+    - Logging in with provided credentials
+    - Listing events, market catalogues, and market books
+
+    This class expects the following to be properly configured:
+      - Credentials (username, password, app_key) via credentials_path in config.json
+      - A certificate path (cert_path in config.json)
+
+    Usage:
+      - Instantiate BetfairClient()
+      - Call .login() to authenticate
+      - Use list_events(), list_market_catalogue(), list_market_book() to fetch data
+
+    Error Handling:
+      - If credentials are missing or invalid, login will fail with an error message.
+      - If listing events/markets is attempted without login, the class will attempt to login again or log an error.
+      - Network or API errors are logged as errors, and you may handle them by checking for empty results.
+    """
+
+    # Logged-in APIClients shared by all instances, keyed by (username, app_key).
+    _shared_trading = {}
+    _login_lock = threading.Lock()
+
+    def __init__(self):
+        logger.debug("Initializing BetfairClient with betfairlightweight.")
+        self.creds = load_credentials()
+        self.username = self.creds.get("username")
+        self.password = self.creds.get("password")
+        self.app_key = self.creds.get("app_key")
+        self.trading = None
+        self.session = build_session()
+        self._events_cache = TTLCache(ttl=EVENTS_CACHE_TTL)
+        self._catalogue_cache = TTLCache(ttl=CATALOGUE_CACHE_TTL)
+
+        if not self.username or not self.password or not self.app_key:
+            logger.warning("Credentials incomplete or missing. Login attempts will fail until credentials are set properly.")
+
+        logger.debug("BetfairClient initialized with username=%s, app_key=%s", self.username, self.app_key)
+
+    def login(self):
+        """
+        Authenticate with the Betfair API using loaded credentials.
+
+        If credentials are missing or invalid, logs an error and does not raise an exception.
+        The caller should check if login was successful by checking if self.trading is not None.
+
+        A successful login is shared by every BetfairClient with the same credentials, and
+        concurrent first logins (e.g. worker threads all calling in at start-up) wait for a
+        single login request instead of each opening their own Betfair session.
+        """
+        if not (self.username and self.password and self.app_key):
+            logger.error("Missing Betfair credentials (username/password/app_key). Check credentials configuration.")
+            return
+
+        key = (self.username, self.app_key)
+        trading = BetfairClient._shared_trading.get(key)
+        if trading is None:
+            with BetfairClient._login_lock:
+                trading = BetfairClient._shared_trading.get(key)
+                if trading is None:
+                    trading = self._create_trading()
+                    if trading is not None:
+                        BetfairClient._shared_trading[key] = trading
+        else:
+            logger.debug("Reusing existing Betfair login.")
+        self.trading = trading
+
+    def _create_trading(self):
+        """
+        Create a betfairlightweight APIClient and log it in.
+
+        :return: The logged-in APIClient, or None if login failed.
+        """
+        logger.debug("Creating Betfair APIClient instance.")
+        trading = betfairlightweight.APIClient(
+            username=self.username,
+            password=self.password,
+            app_key=self.app_key,
+            certs=CERT_PATH,
+            cert_files=find_cert_files(CERT_PATH),
+            session=self.session
+        )
+
+        try:
+            logger.debug("Attempting login via betfairlightweight...")
+            trading.login()
+            logger.info("Login successful. Fetching prices from Betfair Exchange.")
+            return trading
+        except betfairlightweight.exceptions.LoginError as e:
+            logger.error("Login error: %s. Please check your credentials.", e)
+        except Exception as e:
+            logger.error("Unexpected error during login: %s", e)
+        return None
+
+    def keep_alive(self):
+        """
+        Refresh the Betfair session once betfairlightweight considers it due (half the session
+        timeout after login or the last refresh), so a long-running client never hits an expired
+        token. If the refresh fails, logs in again. Does nothing when not logged in.
+        """
+        trading = self.trading
+        if trading is None or not trading.session_expired:
+            return
+        with BetfairClient._login_lock:
+            if not trading.session_expired:
+                # Refreshed by another client sharing this login while we waited.
+                return
+            try:
+                trading.keep_alive()
+                logger.debug("Betfair session refreshed.")
+                return
+            except betfairlightweight.exceptions.BetfairError as e:
+                logger.warning("Betfair keep-alive failed: %s. Logging in again.", e)
+                BetfairClient._shared_trading.pop((self.username, self.app_key), None)
+        self.trading = None
+        self.login()
+
+    def invalidate(self):
+        """
+        Drop all cached list_events / list_market_catalogue responses, e.g. after placing a bet
+        or when fresh market data is required.
+        """
+        self._events_cache.clear()
+        self._catalogue_cache.clear()
+
+    def list_events(self, filter_dict):
+        """
+        List events from Betfair based on a given filter.
+
+        :param filter_dict: A dictionary with a "filter" key specifying eventTypeIds and/or textQuery.
+                            Example:
+                            {
+                              "filter": {
+                                "eventTypeIds": ["1"],
+                                "textQuery": "Manchester"
+                              }
+                            }
+        :return: A list containing a dictionary with "result" key. Example:
+                 [{"result": [
+                    {
+                      "event": {"id": ..., "eventName": ..., "openDate": ...},
+                      "marketCount": ...
+                    }, ...
+                 ]}]
+                 If login fails or no trading session, returns [{"result": []}].
+                 Responses are cached per filter for EVENTS_CACHE_TTL seconds (see invalidate()).
+        """
+        logger.debug("list_events called with filter_dict: %s", filter_dict)
+        cache_key = filter_cache_key(filter_dict)
+        cached = self._events_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("list_events served from cache.")
+            return cached
+
+        if not self.trading:
+            logger.warning("Not logged in. Attempting to login now.")
+            self.login()
+            if not self.trading:
+                logger.error("Cannot list events without a successful login. Returning empty result.")
+                return [{"result": []}]
+
+        bf_filter = filter_dict.get("filter", {})
+        eventTypeIds = bf_filter.get("eventTypeIds", [])
+        textQuery = bf_filter.get("textQuery", "")
+
+        m_filter = cached_market_filter(
+            event_type_ids=tuple(eventTypeIds) if eventTypeIds else None,
+            text_query=textQuery if textQuery else None
+        )
+        logger.debug("Constructed market_filter for list_events: %s", m_filter)
+
+        events = self.trading.betting.list_events(filter=m_filter)
+        logger.debug("list_events returned %d events.", len(events))
+        response = [{"result": shape_events(events)}]
+        self._events_cache.set(cache_key, response)
+        return response
+
+    def list_market_catalogue(self, filter_dict):
+        """
+        List market catalogues for given events or market types.
+
+        :param filter_dict: Should contain:
+                            {
+                              "filter": {
+                                "eventIds": [...],
+                                "marketTypeCodes": [...]
+                              },
+                              "maxResults": int,
+                              "marketProjection": [...]
+                            }
+        :return: [{"result": [ { "marketId": ..., "marketName": ..., "runners": [...] }, ... ]}]
+                 If not logged in, attempts login and returns empty result if still not available.
+                 Responses are cached per filter for CATALOGUE_CACHE_TTL seconds (see invalidate()).
+                 More than CATALOGUE_EVENT_CHUNK_SIZE eventIds are fetched as concurrent shards,
+                 each with its own maxResults; results keep the order of the shards.
+        """
+        logger.debug("list_market_catalogue called with filter_dict: %s", filter_dict)
+        cache_key = filter_cache_key(filter_dict)
+        cached = self._catalogue_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("list_market_catalogue served from cache.")
+            return cached
+
+        if not self.trading:
+            logger.warning("Not logged in. Attempting to login now.")
+            self.login()
+            if not self.trading:
+                logger.error("Cannot list market catalogue without a successful login. Returning empty result.")
+                return [{"result": []}]
+
+        bf_filter = filter_dict.get("filter", {})
+        maxResults = filter_dict.get("maxResults", 100)
+        marketProjection = filter_dict.get("marketProjection", [])
+
+        eventIds = bf_filter.get("eventIds")
+        marketTypeCodes = bf_filter.get("marketTypeCodes")
+        market_type_codes = tuple(marketTypeCodes) if marketTypeCodes is not None else None
+
+        def fetch(event_ids):
+            m_filter = cached_market_filter(event_ids=event_ids, market_type_codes=market_type_codes)
+            logger.debug("Constructed market_filter for list_market_catalogue: %s", m_filter)
+            return self.trading.betting.list_market_catalogue(
+                filter=m_filter,
+                max_results=maxResults,
+                market_projection=marketProjection
+            )
+
+        if eventIds is None or len(eventIds) <= CATALOGUE_EVENT_CHUNK_SIZE:
+            catalogues = fetch(tuple(eventIds) if eventIds is not None else None)
+        else:
+            shards = [tuple(shard) for shard in chunked(eventIds, CATALOGUE_EVENT_CHUNK_SIZE)]
+            logger.debug("Fetching catalogues for %d events in %d concurrent shards.", len(eventIds), len(shards))
+            catalogues = [c for shard_catalogues in _executor.map(fetch, shards) for c in shard_catalogues]
+        logger.debug("list_market_catalogue returned %d catalogues.", len(catalogues))
+
+        response = [{"result": shape_market_catalogues(catalogues)}]
+        self._catalogue_cache.set(cache_key, response)
+        return response
+
+    def list_market_book(self, filter_dict):
+        """
+        List the current state of one or more markets (market book), including runner odds.
+
+        :param filter_dict: Should contain:
+                            {
+                              "marketIds": [...],
+                              "priceProjection": {
+                                "priceData": ["EX_BEST_OFFERS", ...],
+                                "exBestOffersOverrides": {"bestPricesDepth": 1}  # optional
+                              },
+                              "fields": ["availableToLay"]  # optional
+                            }
+                            exBestOffersOverrides defaults to a depth of MARKET_BOOK_PRICE_DEPTH.
+                            "fields" names the ladder sides to return under each runner's "ex"
+                            (default both); a side that isn't requested is left out entirely.
+        :return: [{"result": [ { "marketId": ..., "runners": [...] }, ... ]}]
+                 If not logged in, attempts login and returns empty result if still not available.
+                 More than MARKET_BOOK_CHUNK_SIZE marketIds are fetched as concurrent chunked
+                 calls; results keep the order of the chunks.
+        """
+        logger.debug("list_market_book called with filter_dict: %s", filter_dict)
+        if not self.trading:
+            logger.warning("Not logged in. Attempting to login now.")
+            self.login()
+            if not self.trading:
+                logger.error("Cannot list market book without a successful login. Returning empty result.")
+                return [{"result": []}]
+
+        marketIds = filter_dict.get("marketIds", [])
+        priceProjectionDict = filter_dict.get("priceProjection", {})
+        price_data_list = priceProjectionDict.get("priceData", [])
+        pd = price_data_list if price_data_list else None
+
+        logger.debug("Preparing to call betting.list_market_book with marketIds=%s, priceData=%s", marketIds, pd)
+
+        overrides = priceProjectionDict.get("exBestOffersOverrides") or {"bestPricesDepth": MARKET_BOOK_PRICE_DEPTH}
+        pp = price_projection(price_data=pd, ex_best_offers_overrides=overrides) if pd else None
+        fields = set(filter_dict.get("fields") or MARKET_BOOK_FIELDS)
+        want_lay = "availableToLay" in fields
+        want_back = "availableToBack" in fields
+
+        def fetch(market_ids):
+            # lightweight=True returns the parsed JSON as-is, skipping betfairlightweight's resource objects.
+            return self.trading.betting.list_market_book(market_ids=market_ids, price_projection=pp, lightweight=True)
+
+        chunks = chunked(marketIds, MARKET_BOOK_CHUNK_SIZE)
+        if len(chunks) <= 1:
+            books = fetch(marketIds)
+        else:
+            logger.debug("Fetching %d market books in %d concurrent chunks.", len(marketIds), len(chunks))
+            books = [b for chunk_books in _executor.map(fetch, chunks) for b in chunk_books]
+        logger.debug("list_market_book returned %d market books.", len(books))
+
+        return [{"result": shape_raw_market_books(books, want_lay, want_back)}]
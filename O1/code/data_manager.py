@@ -1,264 +1,572 @@
-import os
-import json
-import logging
-from config import DATA_PATH
-
-class DataManager:
-    """
-    Manages the loading, saving, and in-memory representation of teams, players, and markets data.
-
-    Responsibilities:
-      - Load and store teams, markets, and players data from JSON files in DATA_PATH.
-      - Provide methods to add new teams, markets, and players, automatically saving changes.
-      - Offer lookup methods (e.g., find_team_by_alias()) to search for entities by aliases.
-
-    Potential Future Improvements:
-      - Separate reading/writing logic into a dedicated repository layer for cleaner separation of concerns.
-      - Introduce domain models (e.g., Team, Market, Player classes) to add validation and domain logic at the object level.
-      - Add unit tests by injecting mock data or abstracting file operations, making testing easier.
-    """
-
-    def __init__(self):
-        logging.debug("Initializing DataManager.")
-        self.teams = {}
-        self.players = {}
-        self.markets = {}
-        self.load_all()
-
-    def load_all(self):
-        """
-        Load all data (teams, markets, players) from JSON files in DATA_PATH.
-        
-        If files are missing or malformed, logs warnings or errors and uses empty dicts as fallbacks.
-        After loading:
-          - self.teams, self.markets, self.players are dictionaries keyed by names (lowercase keys recommended).
-        """
-        logging.debug("Loading all data (teams, markets, players).")
-        self.teams = self._safe_load_json("teams.json") or {}
-        self.markets = self._safe_load_json("markets.json") or {}
-
-        players_file = os.path.join(DATA_PATH, "players.json")
-        self.players = self._safe_load_json("players.json") if os.path.exists(players_file) else {}
-        logging.debug("Data loaded. Teams: %d, Markets: %d, Players: %d",
-                      len(self.teams), len(self.markets), len(self.players))
-
-    def _safe_load_json(self, filename: str):
-        """
-        Safely load JSON data from a specified file within DATA_PATH.
-        
-        :param filename: The name of the JSON file to load (e.g., 'teams.json').
-        :return: The loaded data as a dict, or {} if file not found or invalid.
-        """
-        filepath = os.path.join(DATA_PATH, filename)
-        logging.debug(f"Attempting to load JSON data from {filepath}")
-        if not os.path.exists(filepath):
-            logging.warning(f"File {filename} not found at {filepath}. Returning empty data.")
-            return {}
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            logging.debug(f"Loaded {len(data)} items from {filename}")
-            return data
-        except json.JSONDecodeError as e:
-            logging.error(f"Error decoding JSON in file {filename}: {e}")
-            return {}
-        except Exception as e:
-            logging.error(f"Unexpected error loading {filename}: {e}")
-            return {}
-
-    def _safe_save_json(self, filename: str, data: dict):
-        """
-        Safely save a dictionary to a JSON file in DATA_PATH.
-        
-        Logs an error if saving fails, but doesn't raise an exception. 
-        In a more robust system, you might handle errors by retrying or alerting an administrator.
-        
-        :param filename: The name of the JSON file to save to.
-        :param data: The dictionary to save.
-        """
-        filepath = os.path.join(DATA_PATH, filename)
-        logging.debug(f"Attempting to save JSON data to {filepath}")
-        try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
-            logging.debug(f"Successfully saved {len(data)} items to {filename}")
-        except Exception as e:
-            logging.error(f"Failed to save {filename}: {e}")
-
-    def save_all(self):
-        """
-        Save all data (teams, markets, players) to their respective JSON files.
-        
-        If saving fails for any file, logs an error. Some data may still be saved partially.
-        """
-        logging.debug("Saving all data (teams, markets, players).")
-        self._safe_save_json("teams.json", self.teams)
-        self._safe_save_json("markets.json", self.markets)
-        self._safe_save_json("players.json", self.players)
-
-    def add_team(self, team_name: str, sport: str, aliases: list = None):
-        """
-        Add a new team to the in-memory data and persist it to teams.json.
-        
-        :param team_name: The canonical name of the team.
-        :param sport: The sport this team belongs to (required).
-        :param aliases: A list of aliases for this team. Optional, defaults to [].
-        
-        Validations/Checks:
-          - If sport is missing or empty, logs a warning. Continues to add team but consider sport mandatory for future.
-          - If the team already exists, does nothing.
-        
-        After adding, calls save_all(). If saving fails, logs an error.
-        """
-        team_name = team_name.lower().strip()
-        if not sport:
-            logging.warning(f"No sport specified for team '{team_name}'. Consider adding a sport.")
-        if not aliases:
-            aliases = []
-        if team_name not in self.teams:
-            self.teams[team_name] = {
-                "sport": sport,
-                "aliases": aliases
-            }
-            logging.debug(f"Added new team: {team_name} (Sport: {sport}, Aliases: {aliases})")
-            self.save_all()
-
-    def add_market(self, market_name: str, sport: str, mtype: str, aliases: list = None):
-        """
-        Add a new market to the in-memory data and persist it to markets.json.
-        
-        :param market_name: The canonical name of the market (e.g., "match odds").
-        :param sport: The sport for this market.
-        :param mtype: The type of the market (e.g., "MATCH_ODDS").
-        :param aliases: A list of aliases for this market. Optional.
-        
-        Validations/Checks:
-          - If sport or mtype missing, logs a warning. Market still added but consider them required.
-          - If market already exists, does nothing.
-        
-        After adding, calls save_all(). If saving fails, logs an error.
-        """
-        market_name = market_name.lower().strip()
-        if not sport:
-            logging.warning(f"No sport specified for market '{market_name}'. Consider adding a sport.")
-        if not mtype:
-            logging.warning(f"No market type specified for '{market_name}'. Consider adding a type.")
-        if not aliases:
-            aliases = []
-        if market_name not in self.markets:
-            if market_name not in aliases:
-                aliases.append(market_name)
-            self.markets[market_name] = {
-                "sport": sport,
-                "aliases": aliases,
-                "type": mtype,
-                "description": "User-added market"
-            }
-            logging.debug(f"Added new market: {market_name} (Sport: {sport}, Type: {mtype}, Aliases: {aliases})")
-            self.save_all()
-
-    def add_player(self, player_name: str, sport: str, team: str = None, aliases: list = None):
-        """
-        Add a new player to the in-memory data and persist it to players.json.
-        
-        :param player_name: The player's canonical name.
-        :param sport: The sport the player participates in.
-        :param team: The player's team name (optional).
-        :param aliases: List of aliases for the player.
-        
-        Validations/Checks:
-          - If sport is missing, logs a warning. Player still added.
-          - If team given and team doesn't exist, player still added but not linked to team.
-        
-        After adding, attempts to link the player to the team if specified and exists.
-        Calls save_all(). Logs errors if saving fails.
-        """
-        player_name = player_name.lower().strip()
-        if not sport:
-            logging.warning(f"No sport specified for player '{player_name}'. Consider adding a sport.")
-        if not aliases:
-            aliases = []
-        if player_name not in self.players:
-            self.players[player_name] = {
-                "sport": sport,
-                "team": team.lower() if team else None,
-                "aliases": aliases
-            }
-            logging.debug(f"Added new player: {player_name} (Sport: {sport}, Team: {team}, Aliases: {aliases})")
-            self.save_all()
-            if team and team.lower() in self.teams:
-                if "players" not in self.teams[team.lower()]:
-                    self.teams[team.lower()]["players"] = []
-                if player_name not in self.teams[team.lower()]["players"]:
-                    self.teams[team.lower()]["players"].append(player_name)
-                    logging.debug(f"Linked player '{player_name}' to team '{team.lower()}'.")
-                self.save_all()
-
-    def list_teams(self) -> list:
-        """
-        List all known teams by their canonical names.
-        
-        :return: A list of team names.
-        """
-        logging.debug("Listing all teams.")
-        return list(self.teams.keys())
-
-    def list_markets(self) -> list:
-        """
-        List all known markets by their canonical names.
-        
-        :return: A list of market names.
-        """
-        logging.debug("Listing all markets.")
-        return list(self.markets.keys())
-
-    def find_team_by_alias(self, alias: str) -> str:
-        """
-        Find a team by one of its aliases (or its canonical name).
-        
-        :param alias: An alias or canonical name of the team to search for.
-        :return: The canonical team name if found, else None.
-        """
-        logging.debug(f"Searching for team by alias: {alias}")
-        alias = alias.lower().strip()
-        for team_name, data in self.teams.items():
-            all_aliases = [team_name] + data.get("aliases", [])
-            if alias in [a.lower() for a in all_aliases]:
-                logging.debug(f"Found team '{team_name}' for alias '{alias}'")
-                return team_name
-        logging.debug(f"No team found for alias '{alias}'")
-        return None
-
-    def find_market_by_alias(self, alias: str) -> str:
-        """
-        Find a market by one of its aliases (or its canonical name).
-        
-        :param alias: An alias or canonical name of the market.
-        :return: The canonical market name if found, else None.
-        """
-        logging.debug(f"Searching for market by alias: {alias}")
-        alias = alias.lower().strip()
-        for market_name, data in self.markets.items():
-            all_aliases = data.get("aliases", []) + [market_name]
-            if alias in [a.lower() for a in all_aliases]:
-                logging.debug(f"Found market '{market_name}' for alias '{alias}'")
-                return market_name
-        logging.debug(f"No market found for alias '{alias}'")
-        return None
-
-    def find_player_by_alias(self, alias: str) -> str:
-        """
-        Find a player by one of its aliases (or its canonical name).
-        
-        :param alias: An alias or canonical name of the player.
-        :return: The canonical player name if found, else None.
-        """
-        logging.debug(f"Searching for player by alias: {alias}")
-        alias = alias.lower().strip()
-        for player_name, data in self.players.items():
-            all_aliases = [player_name] + data.get("aliases", [])
-            if alias in [a.lower() for a in all_aliases]:
-                logging.debug(f"Found player '{player_name}' for alias '{alias}'")
-                return player_name
-        logging.debug(f"No player found for alias '{alias}'")
-        return None
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterable
+import orjson
+from config import DATA_PATH, COMMON_FILLER_WORDS
+from normalization import fully_normalize_input
+from alias_map import (build_alias_map_teams, build_market_alias_index, build_alias_trie, build_alias_pattern,
+                       normalize_aliases)
+
+logger = logging.getLogger(__name__)
+
+class DataManager:
+    """
+    Manages the loading, saving, and in-memory representation of teams, players, and markets data.
+
+    Responsibilities:
+      - Load and store teams, markets, and players data from JSON files in DATA_PATH.
+      - Provide methods to add new teams, markets, and players, automatically saving the files they change.
+      - Offer lookup methods (e.g., find_team_by_alias()) to search for entities by aliases.
+      - Cache the normalized alias structures used by bet_parser (team_alias_map, market_alias_index,
+        market_alias_pattern), rebuilding them only after the data changes.
+
+    DataManager() returns one shared instance per DATA_PATH, so the data files are parsed
+    once per process no matter how many callers construct it; use load_all() to re-read them.
+
+    Potential Future Improvements:
+      - Separate reading/writing logic into a dedicated repository layer for cleaner separation of concerns.
+      - Introduce domain models (e.g., Team, Market, Player classes) to add validation and domain logic at the object level.
+      - Add unit tests by injecting mock data or abstracting file operations, making testing easier.
+    """
+
+    # Instances by (class, DATA_PATH), shared by every DataManager() call.
+    _instances = {}
+    _instances_lock = threading.RLock()
+
+    def __new__(cls):
+        with DataManager._instances_lock:
+            key = (cls, DATA_PATH)
+            instance = DataManager._instances.get(key)
+            if instance is None:
+                instance = DataManager._instances[key] = super().__new__(cls)
+            return instance
+
+    def __init__(self):
+        with DataManager._instances_lock:
+            if getattr(self, "_loaded", False):
+                return
+            logger.debug("Initializing DataManager.")
+            self.teams = {}
+            self._players = None
+            self.markets = {}
+            self._dirty = set()
+            self._bulk = False
+            self._paths = {filename: os.path.join(DATA_PATH, filename)
+                           for filename in ("teams.json", "markets.json", "players.json")}
+            self.load_all()
+            self._loaded = True
+
+    def load_all(self):
+        """
+        Load all data (teams, markets, players) from JSON files in DATA_PATH.
+        
+        If files are missing or malformed, logs warnings or errors and uses empty dicts as fallbacks.
+        After loading:
+          - self.teams, self.markets, self.players are dictionaries keyed by names (lowercase keys recommended).
+          - players.json is not read until self.players is first accessed (see the players property).
+        """
+        logger.debug("Loading all data (teams, markets, players).")
+        self.teams = self._safe_load_json("teams.json") or {}
+        self.markets = self._safe_load_json("markets.json") or {}
+        self._players = None
+        self._normalize_all_aliases()
+        self._invalidate_alias_caches()
+        logger.debug("Data loaded. Teams: %d, Markets: %d", len(self.teams), len(self.markets))
+
+    @property
+    def players(self) -> dict:
+        """
+        Players keyed by name, loaded from players.json on first access.
+
+        Team and market lookups never touch players, so they don't pay for parsing the file.
+        """
+        if self._players is None:
+            self._players = self._safe_load_json("players.json", warn_missing=False)
+            logger.debug("Players loaded: %d", len(self._players))
+        return self._players
+
+    @players.setter
+    def players(self, value: dict):
+        self._players = value
+
+    def _normalize_all_aliases(self):
+        """
+        Store each team's and market's normalized aliases on the record as "_norm_aliases",
+        and the set of its lowercased aliases as "_aliases_lower".
+
+        These derived fields are what the alias map builders and the alias checks in utils read;
+        they are refreshed on load and save and never written back to disk (see _safe_save_json).
+        The "sport" of each record is lowercased here too, so lookups keyed by sport
+        (SPORT_EVENT_TYPE_IDS, markets_by_sport) never need to case-fold it again.
+        """
+        for records in (self.teams, self.markets):
+            for name, data in records.items():
+                data["_norm_aliases"] = normalize_aliases(name, data)
+                data["_aliases_lower"] = {a.lower() for a in data.get("aliases", [])}
+                sport = data.get("sport")
+                if sport:
+                    data["sport"] = sport.lower()
+
+    def _invalidate_alias_caches(self):
+        """
+        Drop the cached alias structures so they are rebuilt from the current data on next access.
+
+        Called after loading and on every save, since all mutations of teams/markets/players
+        (including direct alias appends by callers) are followed by save_all() or flush().
+        """
+        self._team_alias_map = None
+        self._team_alias_trie = None
+        self._team_name_candidates = None
+        self._market_alias_index = None
+        self._market_alias_lookup = None
+        self._market_alias_pattern = None
+        self._markets_by_sport = None
+        self._team_name_lookup = None
+        self._market_name_lookup = None
+        self._player_name_lookup = None
+
+    @staticmethod
+    def _build_name_lookup(records: dict) -> dict:
+        """
+        Map each record's lowercased canonical name and aliases to the canonical name.
+
+        Used by the find_*_by_alias methods; where several records share an alias, the first
+        one (in catalogue order) wins, as the linear scans they replace did.
+        """
+        lookup = {}
+        for name, data in records.items():
+            for alias in (name, *data.get("aliases", [])):
+                lookup.setdefault(alias.lower(), name)
+        return lookup
+
+    @property
+    def team_alias_map(self) -> dict:
+        """
+        Mapping of normalized team aliases (and canonical names) to canonical team names.
+
+        Built once via build_alias_map_teams() and reused until the data changes.
+        """
+        if self._team_alias_map is None:
+            self._team_alias_map = build_alias_map_teams(self.teams)
+        return self._team_alias_map
+
+    @property
+    def team_alias_trie(self) -> dict:
+        """
+        Token trie over the keys of team_alias_map (see alias_map.build_alias_trie).
+        """
+        if self._team_alias_trie is None:
+            self._team_alias_trie = build_alias_trie(self.team_alias_map)
+        return self._team_alias_trie
+
+    @property
+    def team_name_candidates(self) -> list:
+        """
+        Team names followed by their distinct lowercased aliases, in catalogue order.
+
+        Used by bet_parser.find_closest_team_alias to suggest matches for unknown teams.
+        """
+        if self._team_name_candidates is None:
+            self._team_name_candidates = list(dict.fromkeys(
+                [*self.teams.keys(),
+                 *(a.lower().strip() for data in self.teams.values() for a in data.get("aliases", []))]))
+        return self._team_name_candidates
+
+    @property
+    def market_alias_index(self) -> list:
+        """
+        List of (market_name, raw_alias, normalized_alias) tuples used for fuzzy market matching.
+
+        Built once via build_market_alias_index() and reused until the data changes.
+        """
+        if self._market_alias_index is None:
+            self._market_alias_index = build_market_alias_index(self.markets)
+        return self._market_alias_index
+
+    @property
+    def market_alias_lookup(self) -> dict:
+        """
+        Mapping of market alias phrase -> {sport: (market_name, raw_alias)} for exact-match lookups.
+
+        A phrase is the alias normalized the way bet_parser prepares leftover text: fully
+        normalized, with COMMON_FILLER_WORDS dropped (so "to win and over 2.5" is keyed
+        as "to win over 2.5"). Phrases are shared across sports ("win" is an alias of every
+        moneyline market), so each one maps the sport of a market to that market; when several
+        markets of one sport share a phrase, the first one wins. Derived from market_alias_index.
+        """
+        if self._market_alias_lookup is None:
+            lookup = {}
+            for market_name, raw_alias, _ in self.market_alias_index:
+                phrase = " ".join(w for w in fully_normalize_input(raw_alias).split()
+                                  if w not in COMMON_FILLER_WORDS)
+                sport = self.markets[market_name].get("sport")
+                lookup.setdefault(phrase, {}).setdefault(sport, (market_name, raw_alias))
+            self._market_alias_lookup = lookup
+        return self._market_alias_lookup
+
+    @property
+    def market_alias_pattern(self):
+        """
+        Single regex matching any key of market_alias_lookup as whole tokens, longest first
+        (see alias_map.build_alias_pattern). None when there are no markets.
+        """
+        if self._market_alias_pattern is None:
+            self._market_alias_pattern = build_alias_pattern(self.market_alias_lookup)
+        return self._market_alias_pattern
+
+    @property
+    def markets_by_sport(self) -> dict:
+        """
+        Mapping of sport -> set of the market names for that sport.
+
+        Used by main.fetch_and_compute_lay_prices to find the identified markets compatible
+        with each team's sport.
+        """
+        if self._markets_by_sport is None:
+            by_sport = {}
+            for market_name, data in self.markets.items():
+                by_sport.setdefault(data.get("sport"), set()).add(market_name)
+            self._markets_by_sport = by_sport
+        return self._markets_by_sport
+
+    def _safe_load_json(self, filename: str, warn_missing: bool = True):
+        """
+        Safely load JSON data from a specified file within DATA_PATH.
+        
+        The file is opened directly (no existence pre-check); a missing file is reported from
+        the FileNotFoundError.
+
+        :param filename: The name of the JSON file to load (e.g., 'teams.json').
+        :param warn_missing: Log a warning if the file doesn't exist (players.json is optional).
+        :return: The loaded data as a dict, or {} if file not found or invalid.
+        """
+        filepath = self._paths[filename]
+        logger.debug("Attempting to load JSON data from %s", filepath)
+        try:
+            with open(filepath, "rb") as f:
+                data = orjson.loads(f.read())
+            logger.debug("Loaded %d items from %s", len(data), filename)
+            return data
+        except FileNotFoundError:
+            if warn_missing:
+                logger.warning("File %s not found at %s. Returning empty data.", filename, filepath)
+            return {}
+        except orjson.JSONDecodeError as e:
+            logger.error("Error decoding JSON in file %s: %s", filename, e)
+            return {}
+        except Exception as e:
+            logger.error("Unexpected error loading %s: %s", filename, e)
+            return {}
+
+    def _safe_save_json(self, filename: str, data: dict, pretty: bool = False):
+        """
+        Safely save a dictionary to a JSON file in DATA_PATH.
+        
+        Logs an error if saving fails, but doesn't raise an exception. 
+        In a more robust system, you might handle errors by retrying or alerting an administrator.
+        Derived fields on records (keys starting with "_") are left out of the file.
+        The file is written as compact JSON unless pretty is set. The bytes are written to a
+        temporary file in one write, synced, and renamed over the target, so a failed or
+        interrupted save leaves the previous file intact.
+        
+        :param filename: The name of the JSON file to save to.
+        :param data: The dictionary to save.
+        :param pretty: Indent the output (2 spaces) for human-readable debug dumps.
+        """
+        filepath = self._paths[filename]
+        data = {key: {k: v for k, v in record.items() if not k.startswith("_")} if isinstance(record, dict) else record
+                for key, record in data.items()}
+        logger.debug("Attempting to save JSON data to %s", filepath)
+        try:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+            tmp_path = filepath + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(data, option=option))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+            logger.debug("Successfully saved %d items to %s", len(data), filename)
+        except Exception as e:
+            logger.error("Failed to save %s: %s", filename, e)
+
+    def save_all(self):
+        """
+        Save all data (teams, markets, players) to their respective JSON files.
+        
+        Use this after changing the teams/markets/players dicts directly; the add_* methods
+        only write the files they touch (see flush()). players.json is skipped if the players
+        were never loaded, since nothing can have changed them.
+        If saving fails for any file, logs an error. Some data may still be saved partially.
+        """
+        logger.debug("Saving all data (teams, markets, players).")
+        self._dirty.update(("teams.json", "markets.json"))
+        if self._players is not None:
+            self._dirty.add("players.json")
+        self.flush()
+
+    def mark_dirty(self, *filenames: str):
+        """
+        Record that the data behind the given files (e.g. "teams.json") was changed directly,
+        without writing it yet.
+
+        The derived alias fields and caches are refreshed right away, so lookups see the change;
+        the files are written by the next flush() (or save_all()/add_* call). main registers
+        flush() to run at exit, so a batch of alias additions costs one write per file.
+
+        :param filenames: "teams.json", "markets.json" and/or "players.json".
+        """
+        self._dirty.update(filenames)
+        self._normalize_all_aliases()
+        self._invalidate_alias_caches()
+
+    def flush(self):
+        """
+        Save only the JSON files marked as changed since the last save, then clear the marks.
+
+        The add_* methods mark the file(s) they modify and call this once, so each insert
+        rewrites one file (two for a player linked to a team) instead of all three.
+        Inside a bulk() block only the cached alias structures are dropped; the block saves
+        once when it ends.
+        """
+        if not self._dirty:
+            return
+        self._invalidate_alias_caches()
+        if self._bulk:
+            return
+        logger.debug("Saving changed data files: %s", ", ".join(sorted(self._dirty)))
+        self._normalize_all_aliases()
+        attributes = {"teams.json": "teams", "markets.json": "markets", "players.json": "players"}
+        for filename in sorted(self._dirty):
+            self._safe_save_json(filename, getattr(self, attributes[filename]))
+        self._dirty.clear()
+
+    @contextmanager
+    def bulk(self):
+        """
+        Defer saving for the duration of a with-block, then save every changed file once.
+
+        Example:
+            with data_manager.bulk():
+                for name in names:
+                    data_manager.add_team(name, "football")
+
+        Nested blocks are allowed; only the outermost one saves.
+        """
+        if self._bulk:
+            yield self
+            return
+        self._bulk = True
+        try:
+            yield self
+        finally:
+            self._bulk = False
+            self.flush()
+
+    def add_team(self, team_name: str, sport: str, aliases: list = None):
+        """
+        Add a new team to the in-memory data and persist it to teams.json.
+        
+        :param team_name: The canonical name of the team.
+        :param sport: The sport this team belongs to (required).
+        :param aliases: A list of aliases for this team. Optional, defaults to [].
+        
+        Validations/Checks:
+          - If sport is missing or empty, logs a warning. Continues to add team but consider sport mandatory for future.
+          - If the team already exists, does nothing.
+        
+        After adding, saves teams.json. If saving fails, logs an error.
+        """
+        team_name = team_name.lower().strip()
+        if not sport:
+            logger.warning("No sport specified for team '%s'. Consider adding a sport.", team_name)
+        if not aliases:
+            aliases = []
+        if team_name not in self.teams:
+            self.teams[team_name] = {
+                "sport": sport,
+                "aliases": aliases
+            }
+            logger.debug("Added new team: %s (Sport: %s, Aliases: %s)", team_name, sport, aliases)
+            self._dirty.add("teams.json")
+            self.flush()
+
+    def add_market(self, market_name: str, sport: str, mtype: str, aliases: list = None):
+        """
+        Add a new market to the in-memory data and persist it to markets.json.
+        
+        :param market_name: The canonical name of the market (e.g., "match odds").
+        :param sport: The sport for this market.
+        :param mtype: The type of the market (e.g., "MATCH_ODDS").
+        :param aliases: A list of aliases for this market. Optional.
+        
+        Validations/Checks:
+          - If sport or mtype missing, logs a warning. Market still added but consider them required.
+          - If market already exists, does nothing.
+        
+        After adding, saves markets.json. If saving fails, logs an error.
+        """
+        market_name = market_name.lower().strip()
+        if not sport:
+            logger.warning("No sport specified for market '%s'. Consider adding a sport.", market_name)
+        if not mtype:
+            logger.warning("No market type specified for '%s'. Consider adding a type.", market_name)
+        if not aliases:
+            aliases = []
+        if market_name not in self.markets:
+            if market_name not in aliases:
+                aliases.append(market_name)
+            self.markets[market_name] = {
+                "sport": sport,
+                "aliases": aliases,
+                "type": mtype,
+                "description": "User-added market"
+            }
+            logger.debug("Added new market: %s (Sport: %s, Type: %s, Aliases: %s)", market_name, sport, mtype, aliases)
+            self._dirty.add("markets.json")
+            self.flush()
+
+    def add_player(self, player_name: str, sport: str, team: str = None, aliases: list = None):
+        """
+        Add a new player to the in-memory data and persist it to players.json.
+        
+        :param player_name: The player's canonical name.
+        :param sport: The sport the player participates in.
+        :param team: The player's team name (optional).
+        :param aliases: List of aliases for the player.
+        
+        Validations/Checks:
+          - If sport is missing, logs a warning. Player still added.
+          - If team given and team doesn't exist, player still added but not linked to team.
+        
+        After adding, attempts to link the player to the team if specified and exists.
+        Saves players.json (and teams.json when linked) once. Logs errors if saving fails.
+        """
+        player_name = player_name.lower().strip()
+        team = team.lower() if team else None
+        if not sport:
+            logger.warning("No sport specified for player '%s'. Consider adding a sport.", player_name)
+        if not aliases:
+            aliases = []
+        if player_name not in self.players:
+            self.players[player_name] = {
+                "sport": sport,
+                "team": team,
+                "aliases": aliases
+            }
+            logger.debug("Added new player: %s (Sport: %s, Team: %s, Aliases: %s)", player_name, sport, team, aliases)
+            self._dirty.add("players.json")
+            if team and team in self.teams:
+                team_players = self.teams[team].setdefault("players", [])
+                if player_name not in team_players:
+                    team_players.append(player_name)
+                    logger.debug("Linked player '%s' to team '%s'.", player_name, team)
+                self._dirty.add("teams.json")
+            self.flush()
+
+    def add_teams(self, teams: Iterable[dict]):
+        """
+        Add several teams and save teams.json once at the end.
+
+        :param teams: Dicts of add_team() keyword arguments, e.g. {"team_name": "x", "sport": "football"}.
+        """
+        with self.bulk():
+            for team in teams:
+                self.add_team(**team)
+
+    def add_markets(self, markets: Iterable[dict]):
+        """
+        Add several markets and save markets.json once at the end.
+
+        :param markets: Dicts of add_market() keyword arguments.
+        """
+        with self.bulk():
+            for market in markets:
+                self.add_market(**market)
+
+    def add_players(self, players: Iterable[dict]):
+        """
+        Add several players and save players.json (and teams.json, if any were linked) once at the end.
+
+        :param players: Dicts of add_player() keyword arguments.
+        """
+        with self.bulk():
+            for player in players:
+                self.add_player(**player)
+
+    def list_teams(self) -> list:
+        """
+        List all known teams by their canonical names.
+        
+        :return: A list of team names.
+        """
+        return list(self.teams.keys())
+
+    def list_markets(self) -> list:
+        """
+        List all known markets by their canonical names.
+        
+        :return: A list of market names.
+        """
+        return list(self.markets.keys())
+
+    def find_team_by_alias(self, alias: str) -> str:
+        """
+        Find a team by one of its aliases (or its canonical name).
+        
+        :param alias: An alias or canonical name of the team to search for.
+        :return: The canonical team name if found, else None.
+        """
+        logger.debug("Searching for team by alias: %s", alias)
+        alias = alias.lower().strip()
+        if self._team_name_lookup is None:
+            self._team_name_lookup = self._build_name_lookup(self.teams)
+        team_name = self._team_name_lookup.get(alias)
+        if team_name is not None:
+            logger.debug("Found team '%s' for alias '%s'", team_name, alias)
+            return team_name
+        logger.debug("No team found for alias '%s'", alias)
+        return None
+
+    def find_market_by_alias(self, alias: str) -> str:
+        """
+        Find a market by one of its aliases (or its canonical name).
+        
+        :param alias: An alias or canonical name of the market.
+        :return: The canonical market name if found, else None.
+        """
+        logger.debug("Searching for market by alias: %s", alias)
+        alias = alias.lower().strip()
+        if self._market_name_lookup is None:
+            self._market_name_lookup = self._build_name_lookup(self.markets)
+        market_name = self._market_name_lookup.get(alias)
+        if market_name is not None:
+            logger.debug("Found market '%s' for alias '%s'", market_name, alias)
+            return market_name
+        logger.debug("No market found for alias '%s'", alias)
+        return None
+
+    def find_player_by_alias(self, alias: str) -> str:
+        """
+        Find a player by one of its aliases (or its canonical name).
+        
+        :param alias: An alias or canonical name of the player.
+        :return: The canonical player name if found, else None.
+        """
+        logger.debug("Searching for player by alias: %s", alias)
+        alias = alias.lower().strip()
+        if self._player_name_lookup is None:
+            self._player_name_lookup = self._build_name_lookup(self.players)
+        player_name = self._player_name_lookup.get(alias)
+        if player_name is not None:
+            logger.debug("Found player '%s' for alias '%s'", player_name, alias)
+            return player_name
+        logger.debug("No player found for alias '%s'", alias)
+        return None
+
+def get_data_manager() -> DataManager:
+    """
+    Return the process-wide DataManager, loading the data files on first use only.
+    """
+    return DataManager()
@@ -1,60 +1,70 @@
-import re
-import logging
-
-def normalize_text(text: str) -> str:
-    """
-    Normalize text for alias matching.
-
-    Steps performed:
-      - Strip leading/trailing whitespace.
-      - Convert to lowercase.
-      - Remove apostrophes and right single quotes (’ and '), as these often don't matter for matching.
-      - Retain hyphens and other characters that might distinguish certain aliases.
-    
-    Use Cases:
-      - Pre-processing team, market, or player names before storing or matching against aliases.
-    
-    Example:
-      Input: "  The O'Neill's "
-      Output: "the oneills"
-
-    :param text: The input string to normalize.
-    :return: A normalized string suitable for fuzzy or direct alias matching.
-    """
-    logging.debug(f"Normalizing text: '{text}'")
-    original = text
-    text = text.strip().lower()
-    text = re.sub(r"[’']", "", text)
-    logging.debug(f"Normalized '{original}' to '{text}'")
-    return text
-
-def fully_normalize_input(input_str: str) -> str:
-    """
-    Fully normalize an input string for parsing bets or commands.
-
-    Steps performed:
-      - Convert to lowercase.
-      - Replace standalone '&' with 'and'.
-      - Remove all punctuation except letters, digits, spaces, dots, and hyphens.
-      - Collapse multiple spaces into one.
-
-    Use Cases:
-      - Preparing complex user input (e.g. "Ajax & Lazio!!!") for parsing by removing unnecessary punctuation.
-      - Ensuring consistent formatting for further processing by parsing logic (e.g., bet_parser).
-
-    Example:
-      Input: "  Ajax & Lazio!!! "
-      Output: "ajax and lazio"
-
-    :param input_str: The raw user input string.
-    :return: A fully normalized string with simplified and consistent formatting.
-    """
-    logging.debug(f"Fully normalizing input: '{input_str}'")
-    original = input_str
-    text = input_str.lower()
-    text = text.replace("\u2013", "-").replace("\u2014", "-")
-    text = re.sub(r"\b&\b", "and", text)
-    text = re.sub(r"[^\w\s.\-]", "", text)
-    text = " ".join(text.split())
-    logging.debug(f"Fully normalized '{original}' to '{text}'")
-    return text
+import re
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+_APOS_RE = re.compile(r"[’']")
+_AMP_RE = re.compile(r"\b&\b")
+_PUNCT_RE = re.compile(r"[^\w\s.\-]")
+# ASCII-only equivalent of _PUNCT_RE for pure-ASCII input (the common case), where it avoids the
+# Unicode property lookups. \x1c-\x1f are listed because Unicode \s counts them as whitespace.
+_PUNCT_ASCII_RE = re.compile(r"[^\w\s.\-\x1c-\x1f]", re.ASCII)
+
+@lru_cache(maxsize=4096)
+def normalize_text(text: str) -> str:
+    """
+    Normalize text for alias matching.
+
+    Steps performed:
+      - Strip leading/trailing whitespace.
+      - Convert to lowercase.
+      - Remove apostrophes and right single quotes (’ and '), as these often don't matter for matching.
+      - Retain hyphens and other characters that might distinguish certain aliases.
+    
+    Use Cases:
+      - Pre-processing team, market, or player names before storing or matching against aliases.
+    
+    Example:
+      Input: "  The O'Neill's "
+      Output: "the oneills"
+
+    :param text: The input string to normalize.
+    :return: A normalized string suitable for fuzzy or direct alias matching.
+    """
+    return _APOS_RE.sub("", text.strip().lower())
+
+@lru_cache(maxsize=4096)
+def fully_normalize_input(input_str: str) -> str:
+    """
+    Fully normalize an input string for parsing bets or commands.
+
+    Steps performed:
+      - Convert to lowercase.
+      - Replace standalone '&' with 'and'.
+      - Remove all punctuation except letters, digits, spaces, dots, and hyphens.
+      - Collapse multiple spaces into one.
+
+    Use Cases:
+      - Preparing complex user input (e.g. "Ajax & Lazio!!!") for parsing by removing unnecessary punctuation.
+      - Ensuring consistent formatting for further processing by parsing logic (e.g., bet_parser).
+
+    Results are cached, so the debug messages below are only logged the first time an input is seen.
+
+    Example:
+      Input: "  Ajax & Lazio!!! "
+      Output: "ajax and lazio"
+
+    :param input_str: The raw user input string.
+    :return: A fully normalized string with simplified and consistent formatting.
+    """
+    logger.debug("Fully normalizing input: '%s'", input_str)
+    original = input_str
+    text = input_str.lower()
+    text = text.replace("\u2013", "-").replace("\u2014", "-")
+    if "&" in text:
+        text = _AMP_RE.sub("and", text)
+    text = (_PUNCT_ASCII_RE if text.isascii() else _PUNCT_RE).sub("", text)
+    text = " ".join(text.split())
+    logger.debug("Fully normalized '%s' to '%s'", original, text)
+    return text
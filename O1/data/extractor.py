@@ -1,96 +1,118 @@
-import json
-import re
-from fuzzywuzzy import fuzz
-import os
-
-# Determine the script's directory
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-TEAMS_JSON_PATH = os.path.join(BASE_DIR, "teams.json")
-MATCHES_DATA_PATH = os.path.join(BASE_DIR, "matches.txt")
-
-def normalize_text(t: str) -> str:
-    return t.strip().lower()
-
-def load_teams():
-    try:
-        with open(TEAMS_JSON_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-    except json.JSONDecodeError:
-        return {}
-
-def save_teams(teams_data):
-    # Sort alphabetically by key
-    sorted_teams = dict(sorted(teams_data.items(), key=lambda x: x[0]))
-    with open(TEAMS_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(sorted_teams, f, ensure_ascii=False, indent=4)
-
-def team_exists(teams_data, team_name):
-    for canonical_name, data in teams_data.items():
-        if fuzz.ratio(team_name, canonical_name) == 100:
-            return canonical_name
-        for alias in data.get("aliases", []):
-            if fuzz.ratio(team_name, normalize_text(alias)) == 100:
-                return canonical_name
-    return None
-
-def add_or_update_team(teams_data, team_name, sport):
-    norm_name = normalize_text(team_name)
-    existing_team_key = team_exists(teams_data, norm_name)
-    if existing_team_key:
-        aliases_lower = [normalize_text(a) for a in teams_data[existing_team_key].get("aliases", [])]
-        if team_name.lower() not in aliases_lower:
-            teams_data[existing_team_key]["aliases"].append(team_name)
-        return
-
-    teams_data[norm_name] = {
-        "sport": sport,
-        "aliases": [team_name]
-    }
-
-def clean_team_name(name: str) -> str:
-    name = name.strip()
-    # If (W) is at the end, keep it as is
-    if name.endswith("(W)"):
-        return name
-    # Otherwise, remove trailing info in parentheses or multiple spaces
-    cleaned_name = re.split(r"\s{2,}|\(", name)[0].strip()
-    return cleaned_name
-
-def parse_line_for_teams(line: str):
-    line = line.strip()
-
-    if " v " in line:
-        parts = line.split(" v ")
-    elif " @" in line:
-        parts = line.split(" @ ")
-    else:
-        return None, None
-
-    if len(parts) == 2:
-        home_team = clean_team_name(parts[0])
-        away_team = clean_team_name(parts[1])
-        return home_team, away_team
-
-    return None, None
-
-def main():
-    sport = input("Enter the sport for the teams (e.g. 'football', 'nba'): ").strip().lower()
-
-    teams_data = load_teams()
-
-    with open(MATCHES_DATA_PATH, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    for line in lines:
-        home_team, away_team = parse_line_for_teams(line)
-        if home_team and away_team:
-            add_or_update_team(teams_data, home_team, sport)
-            add_or_update_team(teams_data, away_team, sport)
-
-    save_teams(teams_data)
-    print("Teams updated and saved successfully!")
-
-if __name__ == "__main__":
-    main()
+import re
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import orjson
+
+# Determine the script's directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEAMS_JSON_PATH = os.path.join(BASE_DIR, "teams.json")
+MATCHES_DATA_PATH = os.path.join(BASE_DIR, "matches.txt")
+
+# Where the trailing info after a team name starts: a run of spaces or an opening parenthesis
+_TRAIL_RE = re.compile(r"\s{2,}|\(")
+
+# Team names and aliases recur across lines, so normalized forms are cached (bounded)
+@lru_cache(maxsize=65536)
+def normalize_text(t: str) -> str:
+    return t.strip().lower()
+
+def load_teams():
+    try:
+        with open(TEAMS_JSON_PATH, "rb") as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return {}
+    except orjson.JSONDecodeError:
+        return {}
+
+def save_teams(teams_data):
+    # Sort alphabetically by key, leaving out derived "_" fields such as "_aliases_lower"
+    sorted_teams = {name: {k: v for k, v in data.items() if not k.startswith("_")}
+                    for name, data in sorted(teams_data.items(), key=lambda x: x[0])}
+    # Compact UTF-8 JSON, the same format DataManager._safe_save_json writes teams.json in.
+    # Write to a temporary file and rename it over teams.json, so an interrupted save
+    # leaves the previous file intact instead of a truncated one.
+    tmp_path = TEAMS_JSON_PATH + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(sorted_teams))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, TEAMS_JSON_PATH)
+
+def build_alias_index(teams_data: Dict[str, Dict]) -> Dict[str, str]:
+    # Map each canonical name and normalized alias to its team; the first team listing a name wins
+    alias_index = {}
+    for canonical_name, data in teams_data.items():
+        alias_index.setdefault(canonical_name, canonical_name)
+        for alias in data.get("aliases", []):
+            alias_index.setdefault(normalize_text(alias), canonical_name)
+    return alias_index
+
+def team_exists(alias_index: Dict[str, str], team_name: str) -> Optional[str]:
+    return alias_index.get(team_name)
+
+def add_or_update_team(teams_data: Dict[str, Dict], alias_index: Dict[str, str], team_name: str, sport: str) -> None:
+    norm_name = normalize_text(team_name)
+    existing_team_key = team_exists(alias_index, norm_name)
+    if existing_team_key:
+        info = teams_data[existing_team_key]
+        # Normalized aliases are kept as a set on the record, built on first use
+        aliases_lower = info.get("_aliases_lower")
+        if aliases_lower is None:
+            aliases_lower = info["_aliases_lower"] = {normalize_text(a) for a in info.get("aliases", [])}
+        if norm_name not in aliases_lower:
+            info["aliases"].append(team_name)
+            aliases_lower.add(norm_name)
+        return
+
+    teams_data[norm_name] = {
+        "sport": sport,
+        "aliases": [team_name]
+    }
+    alias_index[norm_name] = norm_name
+
+def clean_team_name(name: str) -> str:
+    name = name.strip()
+    # If (W) is at the end, keep it as is
+    if name.endswith("(W)"):
+        return name
+    # Most names have no "(" and no whitespace run (the only whitespace a printable string can hold
+    # is a single space), so there is nothing to remove
+    if "(" not in name and "  " not in name and name.isprintable():
+        return name
+    # Otherwise, remove trailing info in parentheses or multiple spaces
+    cleaned_name = _TRAIL_RE.split(name, maxsplit=1)[0].strip()
+    return cleaned_name
+
+def parse_line_for_teams(line: str) -> Tuple[Optional[str], Optional[str]]:
+    line = line.strip()
+
+    home_team, sep, away_team = line.partition(" v ")
+    if not sep:
+        home_team, sep, away_team = line.partition(" @ ")
+
+    # Lines without a separator, or with more than one, are not a single fixture
+    if not sep or sep in away_team:
+        return None, None
+
+    return clean_team_name(home_team), clean_team_name(away_team)
+
+def main():
+    sport = input("Enter the sport for the teams (e.g. 'football', 'nba'): ").strip().lower()
+
+    teams_data = load_teams()
+    alias_index = build_alias_index(teams_data)
+
+    # Lines are parsed as the file is read rather than collected into a list first
+    with open(MATCHES_DATA_PATH, "r", encoding="utf-8") as f:
+        for home_team, away_team in map(parse_line_for_teams, f):
+            if home_team and away_team:
+                add_or_update_team(teams_data, alias_index, home_team, sport)
+                add_or_update_team(teams_data, alias_index, away_team, sport)
+
+    save_teams(teams_data)
+    print("Teams updated and saved successfully!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "code"))
+
+import orjson
+
+from alias_map import build_alias_trie
+from bet_parser import find_teams_in_segment, parse_bet
+from data_manager import DataManager
+
+MARKETS_FILE = os.path.join(os.path.dirname(__file__), "..", "data", "markets.json")
+
+
+class FindTeamsInSegmentTest(unittest.TestCase):
+    def find(self, segment, team_map):
+        return find_teams_in_segment(segment, team_map, build_alias_trie(team_map))
+
+    def test_overlapping_aliases_resolve_longest_first(self):
+        team_map = {
+            "al najma": "al najma",
+            "al najma club": "al najma",
+            "club gimnasia y tiro": "club gimnasia y tiro",
+        }
+        found, consumed = self.find("al najma club gimnasia y tiro match odds", team_map)
+        self.assertEqual(found, [("club gimnasia y tiro", "club gimnasia y tiro"), ("al najma", "al najma")])
+        self.assertEqual(consumed, set(range(6)))
+
+    def test_teams_are_reported_longest_first(self):
+        team_map = {"ajax": "ajax", "manchester united": "manchester united"}
+        found, _ = self.find("Ajax Manchester United btts", team_map)
+        self.assertEqual(found, [("manchester united", "Manchester United"), ("ajax", "Ajax")])
+
+
+def fixture_data_manager(teams, markets):
+    """A DataManager over in-memory data, bypassing the shared instance and DATA_PATH."""
+    dm = object.__new__(DataManager)
+    dm.teams = teams
+    dm.markets = markets
+    dm._normalize_all_aliases()
+    dm._invalidate_alias_caches()
+    return dm
+
+
+class ParseBetMarketsTest(unittest.TestCase):
+    TEAMS = {
+        "bolton": {"sport": "football", "aliases": ["Bolton"]},
+        "brest bretagne hb": {"sport": "football", "aliases": ["Brest Bretagne HB"]},
+        "union saint gilloise": {"sport": "football", "aliases": ["Union Saint Gilloise"]},
+        "club gimnasia y tiro": {"sport": "football", "aliases": ["Club Gimnasia y Tiro"]},
+        "platense zacatecoluca": {"sport": "football", "aliases": ["Platense Zacatecoluca"]},
+        "vedder": {"sport": "football", "aliases": ["Vedder"]},
+        "banjul united": {"sport": "football", "aliases": ["Banjul United"]},
+        "chicago bears": {"sport": "nfl", "aliases": ["Chicago Bears", "Bears"]},
+    }
+
+    def setUp(self):
+        with open(MARKETS_FILE, "rb") as f:
+            markets = orjson.loads(f.read())
+        self.data_manager = fixture_data_manager({k: dict(v) for k, v in self.TEAMS.items()}, markets)
+
+    def markets(self, bet):
+        dm = self.data_manager
+        return parse_bet(bet, dm.markets, dm.teams, dm, None)["markets"]
+
+    def test_single_token_alias_does_not_preempt_whole_phrase_match(self):
+        self.assertEqual(self.markets("bolton brest bretagne hb win t nil"), ["to win to nil"])
+        self.assertEqual(self.markets("Union Saint Gilloise shuout win"), ["to win to nil"])
+        self.assertEqual(self.markets("club gimnasia y tiro platense zacatecoluca t win"), ["match odds"])
+        self.assertEqual(self.markets("Bears win and ovr 3.5 goals"), ["match odds and over/under 3.5 goals"])
+
+    def test_fuzzy_matching_repeats_on_what_is_left(self):
+        self.assertEqual(self.markets("vedder banjul united over/under 2.5 gals"),
+                         ["over/under 2.5 goals", "over/under 0.5 goals"])
+
+    def test_exact_aliases_only_match_markets_of_the_bet_sport(self):
+        self.assertEqual(set(self.data_manager.market_alias_lookup["win"]), {"nhl", "nba", "nfl"})
+        self.assertEqual(self.markets("Chicago Bears first touchdown scorer atd win"),
+                         ["first touchdown scorer", "anytime touchdown scorer", "moneyline_nfl"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import io
+import os
+import sys
+import unittest
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "code"))
+
+import main
+
+
+class FakeIntegration:
+    """
+    Stands in for BetfairIntegration: events and lay prices come from the given dicts, a team
+    listed in `failing` raises from its event search, and every call is recorded.
+    """
+
+    def __init__(self, events, prices, failing=()):
+        self.events = events
+        self.prices = prices
+        self.failing = failing
+        self.searched = []
+        self.priced = []
+
+    def find_events_for_team(self, team, sport_id="1"):
+        self.searched.append(team)
+        if team in self.failing:
+            raise RuntimeError(f"search failed for {team}")
+        return [self.events[team]] if team in self.events else []
+
+    def pick_best_event(self, events, team):
+        return events[0] if events else None
+
+    def fetch_best_lay_price_for_team_and_market(self, team, market, scores=None):
+        self.priced.append(team)
+        return self.prices.get(team)
+
+
+class FetchAndComputeLayPricesTest(unittest.TestCase):
+    def run_bet(self, teams, integration):
+        data_manager = SimpleNamespace(teams={}, markets={}, markets_by_sport={})
+        out = io.StringIO()
+        with mock.patch.object(main, "BetfairIntegration", return_value=integration), \
+                mock.patch.object(main, "map_market_name_to_type", return_value=["MATCH_ODDS"]), \
+                redirect_stdout(out):
+            main.fetch_and_compute_lay_prices({"teams": teams}, data_manager, "bk", "football", "bet", 2.0, True)
+        return out.getvalue()
+
+    def test_missing_event_stops_before_later_failures(self):
+        integration = FakeIntegration(events={}, prices={}, failing={"boom"})
+        out = self.run_bet(["ghost", "boom"], integration)
+        self.assertIn("No suitable event found for team 'ghost'", out)
+        self.assertEqual(integration.priced, [])
+
+    def test_failed_search_raises_when_its_team_is_reached(self):
+        integration = FakeIntegration(events={"ajax": {"event": {"id": "1"}}}, prices={"ajax": 1.5},
+                                      failing={"boom"})
+        with self.assertRaisesRegex(RuntimeError, "boom"):
+            self.run_bet(["ajax", "boom", "ghost"], integration)
+        self.assertEqual(integration.priced, ["ajax"])
+
+    def test_missing_price_stops_later_price_lookups(self):
+        events = {"ajax": {"event": {"id": "1"}}, "lazio": {"event": {"id": "2"}}}
+        integration = FakeIntegration(events=events, prices={"lazio": 1.5})
+        out = self.run_bet(["ajax", "lazio"], integration)
+        self.assertIn("Could not find a suitable lay price for the given team/market: ajax/match odds", out)
+        self.assertEqual(integration.priced, ["ajax"])
+
+    def test_prices_are_multiplied_in_bet_order(self):
+        events = {"ajax": {"event": {"id": "1"}}, "lazio": {"event": {"id": "2"}}}
+        integration = FakeIntegration(events=events, prices={"ajax": 1.5, "lazio": 2.0})
+        out = self.run_bet(["ajax", "lazio"], integration)
+        self.assertIn("Multiplied Lay Price: 3.0", out)
+        self.assertEqual(integration.priced, ["ajax", "lazio"])
+
+
+if __name__ == "__main__":
+    unittest.main()